@@ -16,8 +16,13 @@ class User(Base):
     name = Column(String(30))
     fullname = Column(String)
 
+    # "selectin" loads the collections of all users in a result with a single
+    # SELECT..IN query; override per query with noload() / raiseload()
     addresses = relationship(
-        "Address", back_populates="user", cascade="all, delete-orphan"
+        "Address",
+        back_populates="user",
+        cascade="all, delete-orphan",
+        lazy="selectin",
     )
 
     def __repr__(self):
@@ -35,67 +40,120 @@ class Address(Base):
     def __repr__(self):
         return f"Address(id={self.id!r}, email_address={self.email_address!r})"
 
-# "Create an Engine"
-from sqlalchemy import create_engine
-engine = create_engine("sqlite://", echo=True, future=True)
-
-# Emit CREATE TABLE DDL
-Base.metadata.create_all(engine)
-
-# Create Objects and Persist
-from sqlalchemy.orm import Session
-
-with Session(engine) as session: # with is important to close out session 
-    spongebob = User(
-        name="spongebob",
-        fullname="Spongebob Squarepants",
-        addresses=[Address(email_address="spongebob@bikinibottom.net")],
+# the walkthrough below only runs when this file is executed as a script, so
+# importing it for the User / Address models emits no SQL
+if __name__ == "__main__":
+    # "Create an Engine"
+    import logging
+    import os
+    from sqlalchemy import create_engine
+    from sqlalchemy.pool import QueuePool
+
+    # echo stays off; set SQLA_ECHO=1 to log the SQL emitted by each step
+    # through the sqlalchemy.engine logger instead
+    if os.environ.get("SQLA_ECHO") == "1":
+        logging.basicConfig()
+        logging.getLogger("sqlalchemy.engine").setLevel(logging.INFO)
+
+    # a named, shared-cache in-memory database lives as long as one pooled
+    # connection to it stays open, so pooled connections all see the same data;
+    # pool_use_lifo hands out the most recently returned connection first
+    engine = create_engine(
+        "sqlite+pysqlite:///file:quick_start?mode=memory&cache=shared&uri=true",
+        echo=False,
+        future=True,
+        query_cache_size=1200,
+        poolclass=QueuePool,
+        pool_size=5,
+        max_overflow=10,
+        pool_use_lifo=True,
+        connect_args={"check_same_thread": False},
     )
-    sandy = User(
-        name="sandy",
-        fullname="Sandy Cheeks",
-        addresses=[
-            Address(email_address="sandy@bikinibottom.net"),
-            Address(email_address="sandy@squirrelpower.org"),
-        ],
-    )
-    patrick = User(name="patrick", fullname="Patrick Star")
-
-    session.add_all([spongebob, sandy, patrick])
-
-    session.commit()
-
-# Simple SELECT
-from sqlalchemy import select
-session = Session(engine)
-stmt = select(User).where(User.name.in_(["spongebob", "sandy"]))
-for user in session.scalars(stmt):
-    print(user)
-
-# SELECT with JOIN
-stmt = (
-    select(Address)
-    .join(Address.user)
-    .where(User.name == "sandy")
-    .where(Address.email_address == "sandy@bikinibottom.net")
-)
-sandy_address = session.scalars(stmt).one()
-sandy_address
-
-# Make Changes
-stmt = select(User).where(User.name == "patrick")
-patrick = session.scalars(stmt).one()
-# ...SQL output...
-patrick.addresses.append(Address(email_address="patrickstar@bikinibottom.net"))
-# ...SQL output...
-sandy_address.email_address = "sandy_cheeks@bikinibottom.net"
-session.commit()
-# ...SQL output...
-
-# Some Deletes
-sandy = session.get(User, 2)
-sandy.addresses.remove(sandy_address)
-session.flush()
-session.delete(patrick)
-session.commit()
-
+    # a dialect without this flag silently skips the compiled SQL cache
+    if not engine.dialect.supports_statement_cache:
+        raise RuntimeError(
+            "Compiled-SQL cache disabled -- see https://sqlalche.me/e/14/cprf"
+        )
+
+    # Emit CREATE TABLE DDL
+    Base.metadata.create_all(engine)
+
+    # Create Objects and Persist
+    from sqlalchemy import delete, or_, select
+    from sqlalchemy.orm import Session
+    from sqlalchemy.orm import selectinload
+
+    # one session is used for the whole walkthrough, so its identity map carries
+    # over between steps; with is important to close out session
+    with Session(engine) as session:
+        spongebob = User(
+            name="spongebob",
+            fullname="Spongebob Squarepants",
+            addresses=[Address(email_address="spongebob@bikinibottom.net")],
+        )
+        sandy = User(
+            name="sandy",
+            fullname="Sandy Cheeks",
+            addresses=[
+                Address(email_address="sandy@bikinibottom.net"),
+                Address(email_address="sandy@squirrelpower.org"),
+            ],
+        )
+        patrick = User(name="patrick", fullname="Patrick Star")
+
+        session.add_all([spongebob, sandy, patrick])
+
+        session.commit()
+
+        # Simple SELECT
+        # eagerly load each user's addresses in one extra SELECT..IN query,
+        # rather than one lazy load per user when .addresses is accessed
+        stmt = (
+            select(User)
+            .where(User.name.in_(["spongebob", "sandy"]))
+            .options(selectinload(User.addresses))
+        )
+        for user in session.scalars(stmt):
+            print(user)
+
+        # SELECT with JOIN
+        stmt = (
+            select(Address)
+            .join(Address.user)
+            .where(User.name == "sandy")
+            .where(Address.email_address == "sandy@bikinibottom.net")
+        )
+        sandy_address = session.scalars(stmt).one()
+        sandy_address
+
+        # Make Changes
+        stmt = select(User).where(User.name == "patrick")
+        patrick = session.scalars(stmt).one()
+        # ...SQL output...
+        patrick.addresses.append(Address(email_address="patrickstar@bikinibottom.net"))
+        # ...SQL output...
+        sandy_address.email_address = "sandy_cheeks@bikinibottom.net"
+        session.commit()
+        # ...SQL output...
+
+        # Some Deletes
+        # bulk DELETE statements remove the rows without loading sandy, patrick or
+        # their address collections first. cascade="all, delete-orphan" only applies
+        # to ORM-level deletes, so patrick's addresses are deleted explicitly; the
+        # commit() expires the session's objects, so no in-session sync is needed.
+        session.execute(
+            delete(Address)
+            .where(
+                or_(
+                    Address.email_address == "sandy_cheeks@bikinibottom.net",
+                    Address.user_id.in_(select(User.id).where(User.name == "patrick")),
+                )
+            )
+            .execution_options(synchronize_session=False)
+        )
+        session.execute(
+            delete(User)
+            .where(User.name == "patrick")
+            .execution_options(synchronize_session=False)
+        )
+        session.commit()
@@ -1,108 +1,223 @@
 # https://docs.sqlalchemy.org/en/14/tutorial/engine.html
+import functools
+import logging
+import os
+import sys
 from sqlalchemy import create_engine
-engine = create_engine("sqlite+pysqlite:///:memory:", echo=True, future=True)
+from sqlalchemy.pool import QueuePool
+
+# the engine is created once no matter how many sections ask for it.
+# a named, shared-cache in-memory database lives as long as one pooled
+# connection to it stays open, so pooled connections all see the same data;
+# pool_use_lifo hands out the most recently returned connection first.
+# echo stays off; set SQLA_ECHO=1 to log every statement the tutorial emits
+# through the sqlalchemy.engine logger instead. SQLAlchemy checks the logger
+# level before formatting anything, so nothing is built while it's disabled
+@functools.lru_cache(maxsize=1)
+def get_engine():
+    if os.environ.get("SQLA_ECHO") == "1":
+        logging.basicConfig()
+        logging.getLogger("sqlalchemy.engine").setLevel(logging.INFO)
+    engine = create_engine(
+        "sqlite+pysqlite:///file:tutorial?mode=memory&cache=shared&uri=true",
+        echo=False,
+        future=True,
+        query_cache_size=1200,
+        poolclass=QueuePool,
+        pool_size=5,
+        max_overflow=10,
+        pool_use_lifo=True,
+        connect_args={"check_same_thread": False},
+    )
+    # a dialect without this flag silently skips the compiled SQL cache
+    # (raised explicitly, since python -O would strip an assert)
+    if not engine.dialect.supports_statement_cache:
+        raise RuntimeError(
+            "Compiled-SQL cache disabled -- see https://sqlalche.me/e/14/cprf"
+        )
+
+    return engine
+
+# statements are only compiled for display when DEBUG_PRINT is on; set
+# SQLA_PRINT=0, or run with python -O, to skip the compile-and-print steps,
+# e.g. when benchmarking
+DEBUG_PRINT = __debug__ and os.environ.get("SQLA_PRINT", "1") == "1"
+
+def show(stmt, dialect=None):
+    if DEBUG_PRINT:
+        dialect = dialect or get_engine().dialect
+        sys.stdout.write(f"{stmt.compile(dialect=dialect)}\n")
 
-# SQLAlchemy will lazily initialize the engine
+# write each row's repr as the result is iterated, in one writelines() call;
+# the stream is looked up at call time, so redirected stdout is honoured
+def dump(result, out=None):
+    (out or sys.stdout).writelines(f"{r!r}\n" for r in result)
 
 # -----------------------------------------------------------------------------
 # https://docs.sqlalchemy.org/en/14/tutorial/dbapi_transactions.html
 
-from sqlalchemy import text
-with engine.connect() as conn:
-    result = conn.execute(text("select 'hello world everybody'"))
-    print(result.all())
-
-# commit as you go
-with engine.connect() as conn:
-    conn.execute(text("CREATE TABLE some_table (x int, y int)"))
-    conn.execute(
-        text("INSERT INTO some_table (x, y) VALUES (:x, :y)"),
-        [{"x": 1, "y": 1}, {"x": 2, "y": 4}],
-        )
-    conn.commit()
+from sqlalchemy import bindparam, Integer, text
+
+# statements that are executed more than once are constructed a single time;
+# the filtering and UPDATE statements declare their parameter types up front
+SELECT_XY = text("SELECT x, y FROM some_table")
+SELECT_XY_FILTERED = text(
+    "SELECT x, y FROM some_table WHERE y > :y"
+).bindparams(bindparam("y", type_=Integer))
+SELECT_XY_FILTERED_ORDERED = text(
+    "SELECT x, y FROM some_table WHERE y > :y ORDER BY x, y"
+).bindparams(bindparam("y", type_=Integer))
+UPDATE_Y_BY_X = text("UPDATE some_table SET y=:y WHERE x=:x").bindparams(
+    bindparam("x", type_=Integer), bindparam("y", type_=Integer)
+)
 
-# begin once
-with engine.begin() as conn:
-    conn.execute(
-        text("INSERT INTO some_table (x, y) VALUES (:x, :y)"),
-        [{"x": 6, "y": 8}, {"x": 9, "y": 10}],
-        )
+# reads x and y into two contiguous int64 arrays, one batch of rows at a time.
+# this only changes the layout of the output, not the speed of the read: each
+# Row is still built and unpacked by zip(*rows). the two compact columns can
+# be wrapped without a copy by numpy.frombuffer(xs, dtype="int64") where numpy
+# is available. an int64 array can't hold NULL, so a NULL x or y is an error
+from array import array
+
+def read_xy_columns(conn, batch_size=8192):
+    xs, ys = array("q"), array("q")
+    for rows in conn.execute(SELECT_XY).partitions(batch_size):
+        batch_xs, batch_ys = zip(*rows)
+        if None in batch_xs or None in batch_ys:
+            raise ValueError("read_xy_columns() can't store NULL x or y values")
+        xs.extend(batch_xs)
+        ys.extend(batch_ys)
+    return xs, ys
+
+# some_table is declared up front so that later sections can use it without
+# reflecting it back from the database
+from sqlalchemy import MetaData, Table, Column, Integer, insert
+metadata_obj = MetaData()
+some_table = Table(
+    "some_table",
+    metadata_obj,
+    Column("x", Integer),
+    Column("y", Integer),
+)
 
-# basics of statement execution
-with engine.connect() as conn:
-    result = conn.execute(text("SELECT x, y FROM some_table"))
-    for row in result:
-        print(f"x: {row.x} y: {row.y}")
-
-# tuple assignment
-with engine.connect() as conn:
-    result = conn.execute(text("SELECT x, y FROM some_table"))
-    for x, y in result:
-        pass
-
-# integer index
-with engine.connect() as conn:
-    result = conn.execute(text("SELECT x, y FROM some_table"))
-
-    for row in result:
-        x = row[0]
-
-# attribute name
-with engine.connect() as conn:
-    result = conn.execute(text("SELECT x, y FROM some_table"))
-
-    for row in result:
-        y = row.y
-
-        # illustrate use with Python f-strings
-        print(f"Row: {row.x} {y}")
-
-# mapping access
-with engine.connect() as conn:
-    result = conn.execute(text("SELECT x, y FROM some_table"))
-
-    for dict_row in result.mappings():
-        x = dict_row["x"]
-        y = dict_row["y"]
-
-# sending parameters
-with engine.connect() as conn:
-    result = conn.execute(text("SELECT x, y FROM some_table WHERE y > :y"),
-                          {"y": 2})
-    for row in result:
-        print(f"x: {row.x} y: {row.y}")
-
-# sending multiple parameters
-with engine.connect() as conn:
-    conn.execute(
-        text("INSERT INTO some_table (x, y) VALUES (:x, :y)"),
-        [{"x": 11, "y": 12}, {"x": 13, "y": 14}],
-        )
-    conn.commit()
-    
-# -----------------------------------------------------------------------------
-# executing with an ORM session
-from sqlalchemy.orm import Session
-
-stmt = text("SELECT x, y FROM some_table WHERE y > :y ORDER BY x, y")
-with Session(engine) as session:
-    result = session.execute(stmt, {"y": 6})
-    for row in result:
-        print(f"x: {row.x} y: {row.y}")
-
-with Session(engine) as session:
-    result = session.execute(
-        text("UPDATE some_table SET y=:y WHERE x=:x"),
-        [{"x": 9, "y": 11}, {"x": 13, "y": 15}],
+# the schema and seed rows for some_table are emitted a single time per engine
+@functools.lru_cache(maxsize=None)
+def seed_once(engine):
+    # commit as you go
+    with engine.connect() as conn:
+        some_table.create(conn, checkfirst=True)
+        conn.commit()
+
+    # begin once
+    # all of the seed rows are inserted in one transaction, as a single
+    # multi-row INSERT .. VALUES (?, ?), (?, ?), .. statement
+    with engine.begin() as conn:
+        conn.execute(
+            insert(some_table).values(
+                [
+                    {"x": 1, "y": 1},
+                    {"x": 2, "y": 4},
+                    {"x": 6, "y": 8},
+                    {"x": 9, "y": 10},
+                    {"x": 11, "y": 12},
+                    {"x": 13, "y": 14},
+                ]
+            )
         )
-    session.commit()
+
+# the tutorial steps only run when this file is executed as a script, so
+# importing it for its tables and mapped classes emits no SQL
+if __name__ == "__main__":
+    engine = get_engine()
+
+    # SQLAlchemy will lazily initialize the engine
+
+    # the logger can also be switched on for just the statements being
+    # illustrated, then restored to its previous level
+    engine_logger = logging.getLogger("sqlalchemy.engine")
+    previous_level = engine_logger.level
+    logging.basicConfig()
+    engine_logger.setLevel(logging.INFO)
+    with engine.connect() as conn:
+        result = conn.execute(text("select 'hello world everybody'"))
+        dump(result)
+    engine_logger.setLevel(previous_level)
+
+    seed_once(engine)
+
+    # basics of statement execution
+    # the same connection is reused for each way of accessing rows
+    format_xy = "x: {} y: {}".format
+    with engine.connect() as conn:
+        result = conn.execute(SELECT_XY)
+        for x, y in result:
+            print(format_xy(x, y))
+
+        # tuple assignment
+        result = conn.execute(SELECT_XY)
+        for x, y in result:
+            pass
+
+        # integer index
+        result = conn.execute(SELECT_XY)
+
+        for row in result:
+            x = row[0]
+
+        # attribute name
+        result = conn.execute(SELECT_XY)
+
+        for row in result:
+            y = row.y
+
+            # illustrate use with Python f-strings
+            print(f"Row: {row.x} {y}")
+
+        # mapping access
+        result = conn.execute(SELECT_XY)
+
+        for dict_row in result.mappings():
+            x = dict_row["x"]
+            y = dict_row["y"]
+
+        # columnar access, one array per column
+        xs, ys = read_xy_columns(conn)
+        print(f"x: {xs.tolist()} y: {ys.tolist()}")
+
+    # sending parameters
+    with engine.connect() as conn:
+        result = conn.execute(SELECT_XY_FILTERED, {"y": 2})
+        for x, y in result:
+            print(format_xy(x, y))
+
+    # sending multiple parameters
+    # a list of parameter dictionaries passed to execute() runs as a DBAPI
+    # executemany() (see "insert usually generates the values clause" below),
+    # while the "begin once" seed above folds its rows into one statement
+
+    # -------------------------------------------------------------------------
+    # executing with an ORM session
+    # a single Session is used for every ORM example that follows, rather
+    # than a new Session, identity map and connection checkout per example
+    from sqlalchemy.orm import Session
+    # session.begin() commits at the end of the block (or rolls back on an
+    # error), so the session holds no connection between sections
+    session = Session(engine, future=True)
+
+    with session.begin():
+        result = session.execute(SELECT_XY_FILTERED_ORDERED, {"y": 6})
+        for row in result:
+            print(f"x: {row.x} y: {row.y}")
+
+        result = session.execute(
+            UPDATE_Y_BY_X,
+            [{"x": 9, "y": 11}, {"x": 13, "y": 15}],
+            )
 
 # -----------------------------------------------------------------------------
 # working with database metadata
 
 # setting up metadata with table objects
-from sqlalchemy import MetaData
-metadata_obj = MetaData()
+# (metadata_obj was created above, along with some_table)
 
 from sqlalchemy import Table, Column, Integer, String
 user_table = Table(
@@ -123,8 +238,11 @@ address_table = Table(
     Column("email_address", String, nullable=False),
 )
 
-# emitting DDL to the database
-metadata_obj.create_all(engine)
+if __name__ == "__main__":
+    # emitting DDL to the database
+    # some_table was already created by seed_once(), so only the remaining
+    # tables are checked and created here
+    metadata_obj.create_all(engine, tables=[user_table, address_table])
 
 # defining table metadata with the orm
 
@@ -163,875 +281,921 @@ class Address(Base):
     def __repr__(self):
         return f"Address(id={self.id!r}, email_address={self.email_address!r})"
 
-# other mapped class details
-sandy = User(name="sandy", fullname="Sandy Cheeks")
-
-# emitting ddl to the database
-mapper_registry.metadata.create_all(engine)
-Base.metadata.create_all(engine)
-
-# ...
-
-# table reflection
-some_table = Table("some_table", metadata_obj, autoload_with=engine)
-
-# -----------------------------------------------------------------------------
-# working with data
-# https://web.archive.org/web/20220815143402/https://docs.sqlalchemy.org/en/14/tutorial/data.html
-
-# inserting rows with core
-
-# the insert() sql expression construct
-from sqlalchemy import insert, select
-stmt = insert(user_table).values(name='spongebob', fullname="Spongebob Squarepants")
-print(stmt)
-compiled = stmt.compile()
-
-with engine.connect() as conn:
-    result = conn.execute(stmt)
-    conn.commit()
-
-# insert usually generates the "values" clause automatically
-with engine.connect() as conn:
-    result = conn.execute(
-        insert(user_table),
-        [
+if __name__ == "__main__":
+    # the shared session is closed however the sections below exit
+    try:
+        # other mapped class details
+        sandy = User(name="sandy", fullname="Sandy Cheeks")
+
+        # emitting ddl to the database
+        # User and Address map the same user_account and address tables that
+        # metadata_obj.create_all() emitted above, so Base.metadata (which is
+        # mapper_registry.metadata) needs no create_all() of its own
+
+        # ...
+
+        # table reflection
+        # some_table was declared with its columns above, so it is not reflected
+        # by default; set SQLA_REFLECT=1 to load it back from the database into a
+        # separate MetaData, which issues the PRAGMA queries reflection needs
+        DEMO_REFLECTION = os.environ.get("SQLA_REFLECT") == "1"
+        if DEMO_REFLECTION:
+            reflected_table = Table("some_table", MetaData(), autoload_with=engine)
+            print(reflected_table.c.keys())
+
+        # -------------------------------------------------------------------------
+        # working with data
+        # https://web.archive.org/web/20220815143402/https://docs.sqlalchemy.org/en/14/tutorial/data.html
+
+        # inserting rows with core
+
+        # the insert() sql expression construct
+        from sqlalchemy import insert, select
+        stmt = insert(user_table).values(name='spongebob', fullname="Spongebob Squarepants")
+        show(stmt)
+        compiled = stmt.compile()
+
+        # insert usually generates the "values" clause automatically; rather than
+        # executing the statement above, every user row is sent as parameters to
+        # one parameterized INSERT, which shares a single compiled form and runs
+        # as one executemany()
+        user_rows = [
+            {"name": "spongebob", "fullname": "Spongebob Squarepants"},
             {"name": "sandy", "fullname": "Sandy Cheeks"},
             {"name": "patrick", "fullname": "Patrick Star"},
             {"name": "squidward", "fullname": "Squidward T"}
         ]
-    )
-    conn.commit()
-
-# slightly deeper alchemy
-from sqlalchemy import select, bindparam
-scalar_subq = (
-    select(user_table.c.id)
-    .where(user_table.c.name == bindparam("username"))
-    .scalar_subquery()
-)
 
-with engine.connect() as conn:
-    result = conn.execute(
-        insert(address_table).values(user_id=scalar_subq),
-        [
+        # slightly deeper alchemy
+        # the scalar subquery looks up each address's user_id from its username,
+        # so the addresses don't need the new users' primary keys handed back
+        from sqlalchemy import select, bindparam
+        scalar_subq = (
+            select(user_table.c.id)
+            .where(user_table.c.name == bindparam("username"))
+            .scalar_subquery()
+        )
+        address_rows = [
             {"username": "spongebob",
              "email_address": "spongebob@bikinibottom.net"},
             {"username": "sandy",
              "email_address": "sandy@bikinibottom.net"},
             {"username": "sandy",
              "email_address": "sandy@squirrelpower.org"}
-        ],
-    )
-    conn.commit()
-
-# insert ... from select
-select_stmt = select(user_table.c.id, user_table.c.name + "@aol.com")
-insert_stmt = insert(address_table).from_select(
-    ["user_id", "email_address"], select_stmt)
-print(insert_stmt)
-
-# insert ... returning
-insert_stmt = insert(address_table).returning(
-    address_table.c.id, address_table.c.email_address)
-print(insert_stmt)
-
-select_stmt = select(user_table.c.id, user_table.c.name + "@aol.com")
-insert_stmt = insert(address_table).from_select(
-    ["user_id", "email_address"], select_stmt)
-
-print(insert_stmt.returning(address_table.c.id, address_table.c.email_address))
-
-# -----------------------------------------------------------------------------
-from sqlalchemy import select # this was imported previously
-stmt = select(user_table).where(user_table.c.name == "spongebob")
-print(stmt)
-
-with engine.connect() as conn:
-    for row in conn.execute(stmt):
-        print(row)
-
-stmt = select(User).where(User.name == "spongebob")
-with Session(engine) as session:
-    for row in session.execute(stmt):
-        print(row)
-
-# setting the COLUMNS and FROM clause
-print(select(user_table))
-
-print(select(user_table.c.name, user_table.c.fullname))
-
-# selecting orm entities and columns
-
-print(select(User))
-
-row = session.execute(select(User)).first()
-
-#row
-#row[0]
-
-user = session.scalars(select(User)).first()
-print(select(User.name, User.fullname))
-
-row = session.execute(select(User.name, User.fullname)).first()
-
-session.execute(
-    select(User.name, Address).where(User.id == Address.user_id).order_by(
-        Address.id)
-).all()
-
-# selecting from labeled SQL expressions
-from sqlalchemy import func, cast
-stmt = select(
-    ("username: " + user_table.c.name).label("username"),
-    ).order_by(user_table.c.name)
-with engine.connect() as conn:
-    for row in conn.execute(stmt):
-        print(f"{row.username}")
-
-# selecting with textual column expressions
-from sqlalchemy import text
-stmt = select(text("'some phrase'"), user_table.c.name).order_by(user_table.c.name)
-with engine.connect() as conn:
-    print(conn.execute(stmt).all())
-
-from sqlalchemy import literal_column
-stmt = select(literal_column("'some phrase'").label("p"),
-              user_table.c.name).order_by(user_table.c.name)
-with engine.connect() as conn:
-    for row in conn.execute(stmt):
-        print(f"{row.p}, {row.name}")
-
-# the where clause
-print(user_table.c.name == "squidward")
-
-print(address_table.c.user_id > 10)
-
-print(select(user_table).where(user_table.c.name == "squidward"))
-
-print(
-    select(address_table.c.email_address)
-    .where(user_table.c.name == "squidward")
-    .where(address_table.c.user_id == user_table.c.id)
-)
-
-print(
-    select(address_table.c.email_address).where(
-        user_table.c.name == "squidward",
-        address_table.c.user_id == user_table.c.id
-    )
-)
+        ]
 
-# "and" and "or" conjunctions are both available directly using and_() and or_()
-# functions, illustrated below in terms of ORM entities:
-from sqlalchemy import and_, or_
-print(
-    select(Address.email_address).where(
-        and_(
-            or_(User.name == "squidward", User.name == "sandy"),
-            Address.user_id == User.id,
+        # the users and their addresses are inserted in a single transaction
+        with engine.begin() as conn:
+            conn.execute(insert(user_table), user_rows)
+            conn.execute(insert(address_table).values(user_id=scalar_subq), address_rows)
+
+        # insert ... from select
+        select_stmt = select(user_table.c.id, user_table.c.name + "@aol.com")
+        insert_from_select = insert(address_table).from_select(
+            ["user_id", "email_address"], select_stmt)
+        show(insert_from_select)
+
+        # insert ... returning
+        # the SQLite dialect in 1.4 can't render RETURNING, so these are shown as
+        # PostgreSQL would receive them
+        from sqlalchemy.dialects import postgresql
+        insert_stmt = insert(address_table).returning(
+            address_table.c.id, address_table.c.email_address)
+        show(insert_stmt, dialect=postgresql.dialect())
+
+        # the INSERT..FROM SELECT built above is reused rather than rebuilt
+        show(
+            insert_from_select.returning(
+                address_table.c.id, address_table.c.email_address
+            ),
+            dialect=postgresql.dialect(),
         )
-    )
-)
-
-# filter_by()
-print(
-    select(User).filter_by(name="spongebob", fullname="Spongebob Squarepants")
-)
-
-# explicit FROM clauses and JOINs
-print(select(user_table.c.name))
-print(select(user_table.c.name, address_table.c.email_address))
 
-# two ways are available to join the previous two tables:
-
-# Select.join_from() allows to indicate the left and right side of the JOIN
-print(
-    select(user_table.c.name, address_table.c.email_address).join_from(
-        user_table, address_table
-    )
-)
-
-# Select.join() indicates only the right side of the JOIN
-print(
-    select(user_table.c.name, address_table.c.email_address)
-    .join(address_table)
-)
-
-# Select.select_from()
-print(
-    select(address_table.c.email_address)
-    .select_from(user_table).join(address_table)
-)
-
-# to SELECT from the common SQL expression COUNT(), use a SQLAlchemy element
-# known as `sqlalchemy.sql.expression.func` to produce the SQL COUNT() function
-from sqlalchemy import func
-print(select(func.count("*")).select_from(user_table))
+        # -------------------------------------------------------------------------
+        from sqlalchemy import select # this was imported previously
+        stmt = select(user_table).where(user_table.c.name == "spongebob")
+        show(stmt)
+
+        with engine.connect() as conn:
+            for row in conn.execute(stmt):
+                print(row)
+
+        stmt = select(User).where(User.name == "spongebob")
+        for user in session.scalars(stmt):
+            print(user)
+
+        # setting the COLUMNS and FROM clause
+        show(select(user_table))
+
+        show(select(user_table.c.name, user_table.c.fullname))
+
+        # selecting orm entities and columns
+
+        show(select(User))
+
+        # selecting a single entity with scalars() returns the User objects directly,
+        # without wrapping each one in a Row
+        user = session.scalars(select(User)).first()
+        show(select(User.name, User.fullname))
+
+        # a Row is only needed when more than one column is selected
+        row = session.execute(select(User.name, User.fullname)).first()
+
+        # rather than a second query joining User.name to Address, load the users
+        # once with their addresses; selectinload() fetches every user's collection
+        # in one additional SELECT..IN query
+        from sqlalchemy.orm import selectinload
+        stmt = select(User).options(selectinload(User.addresses)).order_by(User.id)
+        users = session.scalars(stmt).all()
+        [(u.name, a) for u in users for a in u.addresses]
+
+        # selecting from labeled SQL expressions
+        # SQLite's printf() builds the string in the database as a single function
+        # call; on other backends func.concat(literal_column("'username: '"), ...)
+        # does the same
+        from sqlalchemy import func, cast
+        stmt = select(
+            func.printf("username: %s", user_table.c.name).label("username"),
+            ).order_by(user_table.c.name)
+        with engine.connect() as conn:
+            for row in conn.execute(stmt):
+                print(f"{row.username}")
+
+        # selecting with textual column expressions
+        from sqlalchemy import text
+        stmt = select(text("'some phrase'"), user_table.c.name).order_by(user_table.c.name)
+        with engine.connect() as conn:
+            dump(conn.execute(stmt))
+
+        from sqlalchemy import literal_column
+        stmt = select(literal_column("'some phrase'").label("p"),
+                      user_table.c.name).order_by(user_table.c.name)
+        with engine.connect() as conn:
+            for row in conn.execute(stmt):
+                print(f"{row.p}, {row.name}")
+
+        # the where clause
+        show(user_table.c.name == "squidward")
+
+        show(address_table.c.user_id > 10)
+
+        show(select(user_table).where(user_table.c.name == "squidward"))
+
+        show(
+            select(address_table.c.email_address)
+            .where(user_table.c.name == "squidward")
+            .where(address_table.c.user_id == user_table.c.id)
+        )
 
-# setting the ON clause
-print(
-    select(address_table.c.email_address)
-    .select_from(user_table)
-    .join(address_table, user_table.c.id == address_table.c.user_id)
-)
+        show(
+            select(address_table.c.email_address).where(
+                user_table.c.name == "squidward",
+                address_table.c.user_id == user_table.c.id
+            )
+        )
 
-# OUTER and FULL join
-print(
-    select(user_table).join(address_table, isouter=True)
-)
+        # "and" and "or" conjunctions are both available directly using and_() and or_()
+        # functions, illustrated below in terms of ORM entities:
+        from sqlalchemy import and_, or_
+        show(
+            select(Address.email_address).where(
+                and_(
+                    or_(User.name == "squidward", User.name == "sandy"),
+                    Address.user_id == User.id,
+                )
+            )
+        )
 
-print(
-    select(user_table).join(address_table, full=True)
-)
+        # filter_by()
+        show(
+            select(User).filter_by(name="spongebob", fullname="Spongebob Squarepants")
+        )
 
-# SQL also has a 'RIGHT OUTER JOIN' but SQLAlchemy doesn't render this directly,
-# instead, reverse the order of the tables and use 'LEFT OUTER JOIN'
+        # explicit FROM clauses and JOINs
+        show(select(user_table.c.name))
+        show(select(user_table.c.name, address_table.c.email_address))
 
-# ORDER BY, GROUP BY, HAVING
+        # two ways are available to join the previous two tables:
 
-# ORDER BY
-print(select(user_table).order_by(user_table.c.name))
+        # Select.join_from() allows to indicate the left and right side of the JOIN
+        show(
+            select(user_table.c.name, address_table.c.email_address).join_from(
+                user_table, address_table
+            )
+        )
 
-# ascending / descending is available from ColumnElement.asc() and
-# ColumnElement.desc()
-print(select(User).order_by(User.fullname.desc()))
+        # Select.join() indicates only the right side of the JOIN
+        show(
+            select(user_table.c.name, address_table.c.email_address)
+            .join(address_table)
+        )
 
-# Aggregate functions with GROUP BY / HAVING
-from sqlalchemy import func
-count_fn = func.count(user_table.c.id)
-print(count_fn)
+        # Select.select_from()
+        show(
+            select(address_table.c.email_address)
+            .select_from(user_table).join(address_table)
+        )
 
-with engine.connect() as conn:
-    result = conn.execute(
-        select(User.name, func.count(Address.id).label("count"))
-        .join(Address)
-        .group_by(User.name)
-        .having(func.count(Address.id) > 1)
-    )
-    print(result.all())
-
-# ordering or grouping by a label
-from sqlalchemy import func, desc
-stmt = (
-    select(Address.user_id, func.count(Address.id).label("num_addresses"))
-    .group_by("user_id")
-    .order_by("user_id", desc("num_addresses"))
-)
-print(stmt)
-
-# using aliases
-user_alias_1 = user_table.alias()
-user_alias_2 = user_table.alias()
-print(
-    select(user_alias_1.c.name, user_alias_2.c.name).join_from(
-        user_alias_1, user_alias_2, user_alias_1.c.id > user_alias_2.c.id
-    )
-)
+        # to SELECT from the common SQL expression COUNT(), use a SQLAlchemy element
+        # known as `sqlalchemy.sql.expression.func` to produce the SQL COUNT() function
+        from sqlalchemy import func
+        # with no arguments, func.count() renders count(*) without a bound "*"
+        show(select(func.count()).select_from(user_table))
+
+        # setting the ON clause
+        show(
+            select(address_table.c.email_address)
+            .select_from(user_table)
+            .join(address_table, user_table.c.id == address_table.c.user_id)
+        )
 
-# ORM entity aliases
-from sqlalchemy.orm import aliased
-address_alias_1 = aliased(Address)
-address_alias_2 = aliased(Address)
-print(
-    select(User)
-    .join_from(User, address_alias_1)
-    .where(address_alias_1.email_address == "patrick@aol.com")
-    .join_from(User, address_alias_2)
-    .where(address_alias_2.email_address == "patrick@gmail.com")
-)
+        # OUTER and FULL join
+        show(
+            select(user_table).join(address_table, isouter=True)
+        )
 
-# subqueries and CTEs
-subq = (
-    select(func.count(address_table.c.id).label("count"), address_table.c.user_id)
-    .group_by(address_table.c.user_id)
-    .subquery()
-)
-print(subq)
-print(select(subq.c.user_id, subq.c.count))
-stmt = select(user_table.c.name, user_table.c.fullname, subq.c.count).join_from(user_table, subq)
-print(stmt)
-
-# Common Table Expressions (CTEs)
-subq = (
-    select(func.count(address_table.c.id).label("count"), address_table.c.user_id)
-    .group_by(address_table.c.user_id)
-    .cte()
-)
-stmt = select(user_table.c.name, user_table.c.fullname, subq.c.count).join_from(
-    user_table, subq
-)
+        show(
+            select(user_table).join(address_table, full=True)
+        )
 
-print(stmt)
+        # SQL also has a 'RIGHT OUTER JOIN' but SQLAlchemy doesn't render this directly,
+        # instead, reverse the order of the tables and use 'LEFT OUTER JOIN'
+
+        # ORDER BY, GROUP BY, HAVING
+
+        # ORDER BY
+        show(select(user_table).order_by(user_table.c.name))
+
+        # ascending / descending is available from ColumnElement.asc() and
+        # ColumnElement.desc()
+        show(select(User).order_by(User.fullname.desc()))
+
+        # Aggregate functions with GROUP BY / HAVING
+        from sqlalchemy import func
+        count_fn = func.count(user_table.c.id)
+        show(count_fn)
+
+        with engine.connect() as conn:
+            result = conn.execute(
+                select(User.name, func.count(Address.id).label("count"))
+                .join(Address)
+                .group_by(User.name)
+                .having(func.count(Address.id) > 1)
+            )
+            dump(result)
+
+        # ordering or grouping by a label
+        from sqlalchemy import func, desc
+        stmt = (
+            select(Address.user_id, func.count(Address.id).label("num_addresses"))
+            .group_by("user_id")
+            .order_by("user_id", desc("num_addresses"))
+        )
+        show(stmt)
+
+        # using aliases
+        user_alias_1 = user_table.alias()
+        user_alias_2 = user_table.alias()
+        show(
+            select(user_alias_1.c.name, user_alias_2.c.name).join_from(
+                user_alias_1, user_alias_2, user_alias_1.c.id > user_alias_2.c.id
+            )
+        )
 
-# ORM entity subqueries/CTEs
-subq = select(Address).where(~Address.email_address.like("%.net")).subquery()
-address_subq = aliased(Address, subq)
-stmt = (
-    select(User, address_subq)
-    .join_from(User, address_subq)
-    .order_by(User.id, address_subq.id)
-)
-with Session(engine) as session:
-    for user, address in session.execute(stmt):
-        print(f"{user} {address}")
-
-# same goal as above, using CTE to achieve
-cte_obj = select(Address).where(~Address.email_address.like("%.net")).cte()
-address_cte = aliased(Address, cte_obj)
-stmt = (
-    select(User, address_cte)
-    .join_from(User, address_cte)
-    .order_by(User.id, address_cte.id)
-)
-with Session(engine) as session:
-    for user, address in session.execute(stmt):
-        print(f"{user} {address}")
-
-# scalar and correlated subqueries
-subq = (
-    select(func.count(address_table.c.id))
-    .where(user_table.c.id == address_table.c.user_id)
-    .scalar_subquery()
-)
-print(subq)
-print(subq == 5)
-stmt = select(user_table.c.name, subq.label("address_count"))
-print(stmt)
-
-stmt = (
-    select(
-        user_table.c.name, address_table.c.email_address, subq.label("address_count")
-    )
-    .join_from(user_table, address_table)
-    .order_by(user_table.c.id, address_table.c.id)
-)
-try: # this next statement will fail because the statement is too ambiguous
-    print(stmt)
-except:
-    pass
-
-# a more specific query
-subq = (
-    select(func.count(address_table.c.id))
-    .where(user_table.c.id == address_table.c.user_id)
-    .scalar_subquery()
-    .correlate(user_table)
-)
+        # ORM entity aliases
+        from sqlalchemy.orm import aliased
+        address_alias_1 = aliased(Address)
+        address_alias_2 = aliased(Address)
+        show(
+            select(User)
+            .join_from(User, address_alias_1)
+            .where(address_alias_1.email_address == "patrick@aol.com")
+            .join_from(User, address_alias_2)
+            .where(address_alias_2.email_address == "patrick@gmail.com")
+        )
 
-# no more ambiguity,
-# the statement then can return the data for this column like any other:
-with engine.connect() as conn:
-    result = conn.execute(
-        select(
-            user_table.c.name,
-            address_table.c.email_address,
-            subq.label("address_count"),
+        # subqueries and CTEs
+        subq = (
+            select(func.count(address_table.c.id).label("count"), address_table.c.user_id)
+            .group_by(address_table.c.user_id)
+            .subquery()
+        )
+        show(subq)
+        show(select(subq.c.user_id, subq.c.count))
+        # both variants share the same base select. the subquery variant is
+        # compiled once against the engine, and that Compiled object is passed
+        # to execute() as it is, with no further compile or cache lookup
+        base = select(user_table.c.name, user_table.c.fullname)
+        subq_v = base.add_columns(subq.c.count).join_from(user_table, subq)
+        compiled_subq = subq_v.compile(engine)
+        if DEBUG_PRINT:
+            print(compiled_subq)
+        with engine.connect() as conn:
+            dump(conn.execute(compiled_subq))
+
+        # Common Table Expressions (CTEs)
+        cte = (
+            select(func.count(address_table.c.id).label("count"), address_table.c.user_id)
+            .group_by(address_table.c.user_id)
+            .cte()
+        )
+        cte_v = base.add_columns(cte.c.count).join_from(user_table, cte)
+        show(cte_v)
+
+        # ORM entity subqueries/CTEs
+        subq = select(Address).where(~Address.email_address.like("%.net")).subquery()
+        address_subq = aliased(Address, subq)
+        stmt = (
+            select(User, address_subq)
+            .join_from(User, address_subq)
+            .order_by(User.id, address_subq.id)
+        )
+        for user, address in session.execute(stmt):
+            print(f"{user} {address}")
+
+        # same goal as above, using CTE to achieve
+        cte_obj = select(Address).where(~Address.email_address.like("%.net")).cte()
+        address_cte = aliased(Address, cte_obj)
+        stmt = (
+            select(User, address_cte)
+            .join_from(User, address_cte)
+            .order_by(User.id, address_cte.id)
+        )
+        for user, address in session.execute(stmt):
+            print(f"{user} {address}")
+
+        # scalar and correlated subqueries
+        subq = (
+            select(func.count(address_table.c.id))
+            .where(user_table.c.id == address_table.c.user_id)
+            .scalar_subquery()
+        )
+        show(subq)
+        show(subq == 5)
+        stmt = select(user_table.c.name, subq.label("address_count"))
+        show(stmt)
+
+        stmt = (
+            select(
+                user_table.c.name, address_table.c.email_address, subq.label("address_count")
+            )
+            .join_from(user_table, address_table)
+            .order_by(user_table.c.id, address_table.c.id)
+        )
+        try: # this next statement will fail because the statement is too ambiguous
+            show(stmt)
+        except:
+            pass
+
+        # a more specific query
+        subq = (
+            select(func.count(address_table.c.id))
+            .where(user_table.c.id == address_table.c.user_id)
+            .scalar_subquery()
+            .correlate(user_table)
         )
-        .join_from(user_table, address_table)
-        .order_by(user_table.c.id, address_table.c.id)
-    )
-    print(result.all())
-
-# LATERAL correlation
-print("LATERAL correlation")
-subq = (
-    select(
-        func.count(address_table.c.id).label("address_count"),
-        address_table.c.email_address,
-        address_table.c.user_id,
-    )
-    .where(user_table.c.id == address_table.c.user_id)
-    .lateral()
-)
-stmt = (
-    select(user_table.c.name, subq.c.address_count, subq.c.email_address)
-    .join_from(user_table, subq)
-    .order_by(user_table.c.id, subq.c.email_address)
-)
-print(stmt)
-
-# UNION, UNION ALL and other set operations
-from sqlalchemy import union_all
-stmt1 = select(user_table).where(user_table.c.name == "sandy")
-stmt2 = select(user_table).where(user_table.c.name == "spongebob")
-u = union_all(stmt1, stmt2)
-with engine.connect() as conn:
-    result = conn.execute(u)
-    print(result.all())
-
-u_subq = u.subquery()
-stmt = (
-    select(u_subq.c.name, address_table.c.email_address)
-    .join_from(address_table, u_subq)
-    .order_by(u_subq.c.name, address_table.c.email_address)
-)
-with engine.connect() as conn:
-    result = conn.execute(stmt)
-    print(result.all())
-
-# selecting ORM entities from Unions
-stmt1 = select(User).where(User.name == "sandy")
-stmt2 = select(User).where(User.name == "spongebob")
-u = union_all(stmt1, stmt2)
-
-orm_stmt = select(User).from_statement(u)
-with Session(engine) as session:
-    for obj in session.execute(orm_stmt).scalars():
-        print(obj)
-
-user_alias = aliased(User, u.subquery())
-orm_stmt = select(user_alias).order_by(user_alias.id)
-with Session(engine) as session:
-    for obj in session.execute(orm_stmt).scalars():
-        print(obj)
-
-# EXISTS subqueries
-subq = (
-    select(func.count(address_table.c.id))
-    .where(user_table.c.id == address_table.c.user_id)
-    .group_by(address_table.c.user_id)
-    .having(func.count(address_table.c.id) > 1)
-).exists()
-with engine.connect() as conn:
-    result = conn.execute(select(user_table.c.name).where(subq))
-    print(result.all())
-# NOT EXISTS
-subq = (
-    select(address_table.c.id).where(
-        user_table.c.id == address_table.c.user_id)
-).exists()
-
-with engine.connect() as conn:
-    result = conn.execute(select(user_table.c.name).where(~subq))
-    print(result.all())
-
-# working with SQL functions
-
-# the count() function, an aggregate function which counts how many rows 
-print(select(func.count()).select_from(user_table))
-
-# the lower() function, a string function that converts a string to lower case
-print(select(func.lower("A String WITH Much UPPERCASE")))
-
-# the now() function, provides current date and time
-stmt = select(func.now())
-with engine.connect() as conn:
-    result = conn.execute(stmt)
-    print(result.all())
-
-# func tries to be as liberal as possible in what it accepts.
-
-print(select(func.some_crazy_function(user_table.c.name, 17)))
-
-from sqlalchemy.dialects import postgresql
-print(select(func.now()).compile(dialect=postgresql.dialect()))
-
-from sqlalchemy.dialects import oracle
-print(select(func.now()).compile(dialect=oracle.dialect()))
-
-# functions have return types
-func.now().type
-from sqlalchemy import JSON
-function_expr = func.json_object('{a, 1, b, "def", c, 3.5}', type_=JSON)
-
-stmt = select(function_expr["def"])
-print(stmt)
-
-# built-in functions have pre-configured return types
-m1 = func.max(Column("some_int", Integer))
-m1.type
-m2 = func.max(Column("some_str", String))
-m2.type
-func.now().type
-func.current_date().type
-func.concat("x", "y").type
-func.upper("lowercase").type
-print(select(func.upper("lowercase") + " suffix"))
-func.count().type
-func.json_object('{"a", "b"}').type
-
-# advanced sql function techniques
-
-# using window functions
-stmt = (
-    select(
-        func.row_number().over(partition_by=user_table.c.name),
-        user_table.c.name,
-        address_table.c.email_address,
-    )
-    .select_from(user_table)
-    .join(address_table)
-)
-with engine.connect() as conn:
-    result = conn.execute(stmt)
-    print(result.all())
-
-# above, the partition_by parameter is used so that the 'PARTITION BY' clause
-# is rendered within the 'OVER' clause; we also may make use of the 'ORDER BY'
-# clause using order_by:
-stmt = (
-    select(
-        func.count().over(order_by=user_table.c.name),
-        user_table.c.name,
-        address_table.c.email_address,
-    )
-    .select_from(user_table)
-    .join(address_table)
-)
-with engine.connect() as conn:
-    result = conn.execute(stmt)
-    print(result.all())
 
-# FunctionElement.over() only applies to SQL aggregate functions. SQLAlchemy
-# will emit it, but the database could reject the expression if used incorrectly
+        # no more ambiguity,
+        # the statement then can return the data for this column like any other:
+        show(
+            select(
+                user_table.c.name,
+                address_table.c.email_address,
+                subq.label("address_count"),
+            )
+            .join_from(user_table, address_table)
+            .order_by(user_table.c.id, address_table.c.id)
+        )
 
-# special modifiers WITHIN GROUP, FILTER
+        # the correlated subquery is evaluated once per outer row; the same
+        # result comes from counting every user's addresses in one GROUP BY pass
+        # and joining those counts back in
+        addr_counts = (
+            select(
+                address_table.c.user_id,
+                func.count(address_table.c.id).label("address_count"),
+            )
+            .group_by(address_table.c.user_id)
+            .subquery()
+        )
+        with engine.connect() as conn:
+            result = conn.execute(
+                select(
+                    user_table.c.name,
+                    address_table.c.email_address,
+                    addr_counts.c.address_count,
+                )
+                .join_from(user_table, address_table)
+                .join(addr_counts, addr_counts.c.user_id == user_table.c.id)
+                .order_by(user_table.c.id, address_table.c.id)
+            )
+            dump(result)
+
+        # LATERAL correlation
+        print("LATERAL correlation")
+        subq = (
+            select(
+                func.count(address_table.c.id).label("address_count"),
+                address_table.c.email_address,
+                address_table.c.user_id,
+            )
+            .where(user_table.c.id == address_table.c.user_id)
+            .lateral()
+        )
+        stmt = (
+            select(user_table.c.name, subq.c.address_count, subq.c.email_address)
+            .join_from(user_table, subq)
+            .order_by(user_table.c.id, subq.c.email_address)
+        )
+        show(stmt)
+
+        # UNION, UNION ALL and other set operations
+        from sqlalchemy import union_all
+        stmt1 = select(user_table).where(user_table.c.name == "sandy")
+        stmt2 = select(user_table).where(user_table.c.name == "spongebob")
+        u = union_all(stmt1, stmt2)
+        with engine.connect() as conn:
+            result = conn.execute(u)
+            dump(result)
+
+        u_subq = u.subquery()
+        stmt = (
+            select(u_subq.c.name, address_table.c.email_address)
+            .join_from(address_table, u_subq)
+            .order_by(u_subq.c.name, address_table.c.email_address)
+        )
+        with engine.connect() as conn:
+            result = conn.execute(stmt)
+            dump(result)
+
+        # selecting ORM entities from Unions
+        stmt1 = select(User).where(User.name == "sandy")
+        stmt2 = select(User).where(User.name == "spongebob")
+        u = union_all(stmt1, stmt2)
+
+        orm_stmt = select(User).from_statement(u)
+        for obj in session.scalars(orm_stmt):
+            print(obj)
+
+        user_alias = aliased(User, u.subquery())
+        orm_stmt = select(user_alias).order_by(user_alias.id)
+        for obj in session.scalars(orm_stmt):
+            print(obj)
+
+        # EXISTS subqueries
+        subq = (
+            select(func.count(address_table.c.id))
+            .where(user_table.c.id == address_table.c.user_id)
+            .group_by(address_table.c.user_id)
+            .having(func.count(address_table.c.id) > 1)
+        ).exists()
+        with engine.connect() as conn:
+            result = conn.execute(select(user_table.c.name).where(subq))
+            dump(result)
+        # NOT EXISTS
+        subq = (
+            select(address_table.c.id).where(
+                user_table.c.id == address_table.c.user_id)
+        ).exists()
+
+        with engine.connect() as conn:
+            result = conn.execute(select(user_table.c.name).where(~subq))
+            dump(result)
+
+        # working with SQL functions
+
+        # the count() function, an aggregate function which counts how many rows 
+        show(select(func.count()).select_from(user_table))
+
+        # the lower() function, a string function that converts a string to lower case
+        show(select(func.lower("A String WITH Much UPPERCASE")))
+
+        # the now() function, provides current date and time
+        # built once, then executed and rendered for each dialect below
+        now_stmt = select(func.now())
+        with engine.connect() as conn:
+            result = conn.execute(now_stmt)
+            dump(result)
+
+        # func tries to be as liberal as possible in what it accepts.
+
+        show(select(func.some_crazy_function(user_table.c.name, 17)))
+
+        from sqlalchemy.dialects import postgresql
+        show(now_stmt, dialect=postgresql.dialect())
+
+        from sqlalchemy.dialects import oracle
+        show(now_stmt, dialect=oracle.dialect())
+
+        # functions have return types
+        func.now().type
+        from sqlalchemy import JSON
+        function_expr = func.json_object('{a, 1, b, "def", c, 3.5}', type_=JSON)
+
+        stmt = select(function_expr["def"])
+        show(stmt)
+
+        # built-in functions have pre-configured return types
+        m1 = func.max(Column("some_int", Integer))
+        m1.type
+        m2 = func.max(Column("some_str", String))
+        m2.type
+        func.now().type
+        func.current_date().type
+        func.concat("x", "y").type
+        func.upper("lowercase").type
+        show(select(func.upper("lowercase") + " suffix"))
+        func.count().type
+        func.json_object('{"a", "b"}').type
+
+        # advanced sql function techniques
+
+        # using window functions
+        stmt = (
+            select(
+                func.row_number().over(partition_by=user_table.c.name),
+                user_table.c.name,
+                address_table.c.email_address,
+            )
+            .select_from(user_table)
+            .join(address_table)
+        )
+        with engine.connect() as conn:
+            result = conn.execute(stmt)
+            dump(result)
+
+        # above, the partition_by parameter is used so that the 'PARTITION BY' clause
+        # is rendered within the 'OVER' clause; we also may make use of the 'ORDER BY'
+        # clause using order_by:
+        stmt = (
+            select(
+                func.count().over(order_by=user_table.c.name),
+                user_table.c.name,
+                address_table.c.email_address,
+            )
+            .select_from(user_table)
+            .join(address_table)
+        )
+        with engine.connect() as conn:
+            result = conn.execute(stmt)
+            dump(result)
 
-print(
-    func.unnest(
-        func.percentile_disc([0.25, 0.5, 0.75, 1]).within_group(user_table.c.name)
-    )
-)
+        # FunctionElement.over() only applies to SQL aggregate functions. SQLAlchemy
+        # will emit it, but the database could reject the expression if used incorrectly
 
-stmt = (
-    select(
-        func.count(address_table.c.email_address).filter(user_table.c.name == "sandy"),
-        func.count(address_table.c.email_address).filter(
-            user_table.c.name == "spongebob"
-        ),
-    )
-    .select_from(user_table)
-    .join(address_table)
-)
+        # special modifiers WITHIN GROUP, FILTER
 
-with engine.connect() as conn:
-    result = conn.execute(stmt)
-    print(result.all())
-
-onetwothree = func.json_each('["one", "two", "three"]').table_valued("value")
-stmt = select(onetwothree).where(onetwothree.c.value.in_(["two", "three"]))
-with engine.connect() as conn:
-    result = conn.execute(stmt)
-    result.all()
-
-# column valued functions - table valued function as a scalar column
-from sqlalchemy import select, func
-stmt = select(func.json_array_elements('["one", "two"').column_valued("x"))
-print(stmt)
-
-from sqlalchemy.dialects import oracle
-stmt = select(func.scalar_strings(5).column_valued("s"))
-print(stmt.compile(dialect=oracle.dialect()))
-
-# data casts and type coercion
-from sqlalchemy import cast
-stmt = select(cast(user_table.c.id, String))
-with engine.connect() as conn:
-    result = conn.execute(stmt)
-    result.all()
-
-from sqlalchemy import JSON
-print(cast("{'a': 'b'}", JSON)["a"])
-
-# type_coerce() - a Python-only "cast"
-
-import json
-from sqlalchemy import JSON
-from sqlalchemy import type_coerce
-from sqlalchemy.dialects import mysql
-s = select(type_coerce({"some_key": {"foo": "bar"}}, JSON)["some_key"])
-print(s.compile(dialect=mysql.dialect()))
-
-# updating and deleting rows with core
-
-# the update() SQL expression construct
-from sqlalchemy import update
-stmt = (
-    update(user_table)
-    .where(user_table.c.name == "patrick")
-    .values(fullname="Patrick Star")
-)
-print(stmt)
+        show(
+            func.unnest(
+                func.percentile_disc([0.25, 0.5, 0.75, 1]).within_group(user_table.c.name)
+            )
+        )
 
-stmt = update(user_table).values(fullname="Username: " + user_table.c.name)
-print(stmt)
+        stmt = (
+            select(
+                func.count(address_table.c.email_address).filter(user_table.c.name == "sandy"),
+                func.count(address_table.c.email_address).filter(
+                    user_table.c.name == "spongebob"
+                ),
+            )
+            .select_from(user_table)
+            .join(address_table)
+        )
 
-# supporting updates in an 'executemany' context
-from sqlalchemy import bindparam
-stmt = (
-    update(user_table)
-    .where(user_table.c.name == bindparam("oldname"))
-    .values(name=bindparam("newname"))
-)
-with engine.begin() as conn:
-    conn.execute(
-        stmt,
-        [
-            {"oldname": "jack", "newname": "ed"},
-            {"oldname": "wendy", "newname": "mary"},
-            {"oldname": "jim", "newname": "james"},
-        ],
-    )
+        with engine.connect() as conn:
+            result = conn.execute(stmt)
+            dump(result)
+
+        onetwothree = func.json_each('["one", "two", "three"]').table_valued("value")
+        stmt = select(onetwothree).where(onetwothree.c.value.in_(["two", "three"]))
+        with engine.connect() as conn:
+            result = conn.execute(stmt)
+            result.all()
+
+        # column valued functions - table valued function as a scalar column
+        from sqlalchemy import select, func
+        stmt = select(func.json_array_elements('["one", "two"').column_valued("x"))
+        show(stmt)
+
+        from sqlalchemy.dialects import oracle
+        stmt = select(func.scalar_strings(5).column_valued("s"))
+        show(stmt, dialect=oracle.dialect())
+
+        # data casts and type coercion
+        from sqlalchemy import cast
+        stmt = select(cast(user_table.c.id, String))
+        with engine.connect() as conn:
+            result = conn.execute(stmt)
+            result.all()
+
+        from sqlalchemy import JSON
+        show(cast("{'a': 'b'}", JSON)["a"])
+
+        # type_coerce() - a Python-only "cast"
+
+        import json
+        from sqlalchemy import JSON
+        from sqlalchemy import type_coerce
+        from sqlalchemy.dialects import mysql
+        s = select(type_coerce({"some_key": {"foo": "bar"}}, JSON)["some_key"])
+        show(s, dialect=mysql.dialect())
+
+        # updating and deleting rows with core
+
+        # the update() SQL expression construct
+        from sqlalchemy import update
+        stmt = (
+            update(user_table)
+            .where(user_table.c.name == "patrick")
+            .values(fullname="Patrick Star")
+        )
+        show(stmt)
+
+        stmt = update(user_table).values(fullname="Username: " + user_table.c.name)
+        show(stmt)
+
+        # supporting updates in an 'executemany' context
+        # executing this with a list of {"oldname": .., "newname": ..} dicts runs
+        # one UPDATE per dictionary
+        from sqlalchemy import bindparam
+        stmt = (
+            update(user_table)
+            .where(user_table.c.name == bindparam("oldname"))
+            .values(name=bindparam("newname"))
+        )
+        show(stmt)
+
+        # the same renames are applied by a single UPDATE, with CASE choosing
+        # each row's new name
+        from sqlalchemy import case
+        renames = {"jack": "ed", "wendy": "mary", "jim": "james"}
+        stmt = (
+            update(user_table)
+            .where(user_table.c.name.in_(list(renames)))
+            .values(name=case(renames, value=user_table.c.name))
+        )
+        with engine.begin() as conn:
+            conn.execute(stmt)
+
+        # correlated updates
+        scalar_subq = (
+            select(address_table.c.email_address)
+            .where(address_table.c.user_id == user_table.c.id)
+            .order_by(address_table.c.id)
+            .limit(1)
+            .scalar_subquery()
+        )
+        update_stmt = update(user_table).values(fullname=scalar_subq)
+        show(update_stmt)
+
+        # UPDATE..FROM
+        # sqlalchemy automatically determines FROM clauses for postgres/mysql
+        update_stmt = (
+            update(user_table)
+            .where(user_table.c.id == address_table.c.user_id)
+            .where(address_table.c.email_address == "patrick@aol.com")
+            .values(fullname="Pat")
+        )
+        show(update_stmt, dialect=postgresql.dialect())
+
+        # there is a mysql specific syntax to update multiple tables
+        # (what happens if not using mysql?)
+        update_stmt = (
+            update(user_table)
+            .where(user_table.c.id == address_table.c.user_id)
+            .where(address_table.c.email_address == "patrick@aol.com")
+            .values(
+                {
+                    user_table.c.fullname: "Patrix",
+                    address_table.c.email_address: "patrick@bikinibottom.net"
+                }
+            )
+        )
+        from sqlalchemy.dialects import mysql
+        show(update_stmt, dialect=mysql.dialect())
 
-# correlated updates
-scalar_subq = (
-    select(address_table.c.email_address)
-    .where(address_table.c.user_id == user_table.c.id)
-    .order_by(address_table.c.id)
-    .limit(1)
-    .scalar_subquery()
-)
-update_stmt = update(user_table).values(fullname=scalar_subq)
-print(update_stmt)
-
-# UPDATE..FROM
-# sqlalchemy automatically determines FROM clauses for postgres/mysql
-update_stmt = (
-    update(user_table)
-    .where(user_table.c.id == address_table.c.user_id)
-    .where(address_table.c.email_address == "patrick@aol.com")
-    .values(fullname="Pat")
-)
-print(update_stmt)
-
-# there is a mysql specific syntax to update multiple tables
-# (what happens if not using mysql?)
-update_stmt = (
-    update(user_table)
-    .where(user_table.c.id == address_table.c.user_id)
-    .where(address_table.c.email_address == "patrick@aol.com")
-    .values(
-        {
-            user_table.c.fullname: "Patrix",
-            address_table.c.email_address: "patrick@bikinibottom.net"
-        }
-    )
-)
-from sqlalchemy.dialects import mysql
-print(update_stmt.compile(dialect=mysql.dialect()))
-      
-# parameter ordered updates
-update_stmt = update(some_table).ordered_values(
-    (some_table.c.y, 20), (some_table.c.x, some_table.c.y + 10)
-)
-print(update_stmt)
-
-# the delete() SQL expression construct
-from sqlalchemy import delete
-stmt = delete(user_table).where(user_table.c.name == "patrick")
-print(stmt)
-
-# multiple table deletes
-delete_stmt = (
-    delete(user_table)
-    .where(user_table.c.id == address_table.c.user_id)
-    .where(address_table.c.email_address == "patrick@aol.com")
-)
-from sqlalchemy.dialects import mysql
-print(delete_stmt.compile(dialect=mysql.dialect()))
-
-# getting affected row count from UPDATE, DELETE
-with engine.begin() as conn:
-    result = conn.execute(
-        update(user_table)
-        .values(fullname="Patrick McStar")
-        .where(user_table.c.name == "patrick")
-    )
-    print(result.rowcount)
-
-# using RETURNING with UPDATE, DELETE
-update_stmt = (
-    update(user_table)
-    .where(user_table.c.name == "patrick")
-    .values(fullname="Patrick MuhStar")
-    .returning(user_table.c.id, user_table.c.name)
-)
-print(update_stmt)
+        # parameter ordered updates
+        update_stmt = update(some_table).ordered_values(
+            (some_table.c.y, 20), (some_table.c.x, some_table.c.y + 10)
+        )
+        show(update_stmt)
+
+        # the delete() SQL expression construct
+        from sqlalchemy import delete
+        stmt = delete(user_table).where(user_table.c.name == "patrick")
+        show(stmt)
+
+        # multiple table deletes
+        delete_stmt = (
+            delete(user_table)
+            .where(user_table.c.id == address_table.c.user_id)
+            .where(address_table.c.email_address == "patrick@aol.com")
+        )
+        from sqlalchemy.dialects import mysql
+        show(delete_stmt, dialect=mysql.dialect())
+
+        # getting affected row count from UPDATE, DELETE
+        with engine.begin() as conn:
+            result = conn.execute(
+                update(user_table)
+                .values(fullname="Patrick McStar")
+                .where(user_table.c.name == "patrick")
+            )
+            print(result.rowcount)
+
+        # using RETURNING with UPDATE, DELETE
+        update_stmt = (
+            update(user_table)
+            .where(user_table.c.name == "patrick")
+            .values(fullname="Patrick MuhStar")
+            .returning(user_table.c.id, user_table.c.name)
+        )
+        show(update_stmt, dialect=postgresql.dialect())
 
-delete_stmt = (
-    delete(user_table)
-    .where(user_table.c.name == "patrick")
-    .returning(user_table.c.id, user_table.c.name)
-)
-print(delete_stmt)
+        delete_stmt = (
+            delete(user_table)
+            .where(user_table.c.name == "patrick")
+            .returning(user_table.c.id, user_table.c.name)
+        )
+        show(delete_stmt, dialect=postgresql.dialect())
 
-# -----------------------------------------------------------------------------
-# data manipulation with the ORM
+        # -------------------------------------------------------------------------
+        # data manipulation with the ORM
 
-# this section will build out the lifecycle of the Session and how it interacts
-# with these constructs
+        # this section will build out the lifecycle of the Session and how it interacts
+        # with these constructs
 
-# inserting rows with the ORM
+        # inserting rows with the ORM
 
-# instruct the Session object to emit INSERT statements by adding objects to it
+        # instruct the Session object to emit INSERT statements by adding objects to it
 
-# instances of classes represent rows
-squidward = User(name="squidward", fullname="Squidward Tentacles")
-krabs = User(name="ehkrabs", fullname="Eugene H. Krabs")
+        # instances of classes represent rows
+        squidward = User(name="squidward", fullname="Squidward Tentacles")
+        krabs = User(name="ehkrabs", fullname="Eugene H. Krabs")
 
-# adding objects to a session, remember to close this session later
-session = Session(engine)
-session.add(squidward)
-session.add(krabs)
-session.new # shows pending objects
+        # adding objects to the session, remember to close this session later
+        session.add(squidward)
+        session.add(krabs)
+        session.new # shows pending objects
 
-# flushing
-# the session makes use of a pattern known as unit of work -- accumulating
-# changes one at a time, but does not actually communicate them to the database
-# until it is needed.
-session.flush()
+        # flushing
+        # the session makes use of a pattern known as unit of work -- accumulating
+        # changes one at a time, but does not actually communicate them to the database
+        # until it is needed.
+        session.flush()
 
-# autogenerated primary key attributes
+        # autogenerated primary key attributes
 
-squidward.id
-krabs.id
+        squidward.id
+        krabs.id
 
-# when a DBMS is using an autogenerated sequence (AUTOINCREMENT, SERIAL, etc.),
-# the autogenerated primary key will not be available from SQLAlchemy until
-# flush() or commit() is called.
-#
-# Some database backends such as psycopg2 can also INSERT many rows at once
-# while still being able to retrieve the primary key values.
+        # when a DBMS is using an autogenerated sequence (AUTOINCREMENT, SERIAL, etc.),
+        # the autogenerated primary key will not be available from SQLAlchemy until
+        # flush() or commit() is called.
+        #
+        # Some database backends such as psycopg2 can also INSERT many rows at once
+        # while still being able to retrieve the primary key values.
 
-# getting objects by primary key from the identity map
-some_squidward = session.get(User, 4)
+        # getting objects by primary key from the identity map
+        some_squidward = session.get(User, 4)
 
-# the identity map is a critical feature that allows complex sets of objects to
-# be manipulated within a transaction without things getting out of sync.
+        # the identity map is a critical feature that allows complex sets of objects to
+        # be manipulated within a transaction without things getting out of sync.
 
-some_squidward is squidward
+        some_squidward is squidward
 
-# committing
-session.commit()
+        # committing
+        session.commit()
 
-# updating ORM objects
-sandy = session.execute(select(User).filter_by(name="sandy")).scalar_one()
+        # updating ORM objects
+        sandy = session.scalars(select(User).filter_by(name="sandy")).one()
 
-sandy
-sandy.fullname
-sandy in session.dirty
+        sandy
+        sandy.fullname
+        sandy in session.dirty
 
-sandy_fullname = session.execute(select(User.fullname).where(User.id == 2)).scalar_one()
-print(sandy_fullname)
+        sandy_fullname = session.scalars(select(User.fullname).where(User.id == 2)).one()
+        print(sandy_fullname)
 
-# deleting ORM objects
+        # deleting ORM objects
 
-# "Let’s load up patrick from the database:"
-patrick = session.get(User, 3)
-session.delete(patrick)
-# deletion occurs after the flush/commit, automatic before next query
-session.execute(select(User).where(User.name == "patrick")).first()
+        # "Let’s load up patrick from the database:"
+        patrick = session.get(User, 3)
+        session.delete(patrick)
+        # deletion occurs after the flush/commit, automatic before next query
+        session.scalars(select(User).where(User.name == "patrick")).first()
 
-patrick in session
+        patrick in session
 
-# ORM-enabled DELETE statements
+        # ORM-enabled DELETE statements
 
-squidward = session.get(User, 4)
-session.execute(delete(User).where(User.name == "squidward"))
+        squidward = session.get(User, 4)
+        session.execute(delete(User).where(User.name == "squidward"))
 
-squidward in session
+        squidward in session
 
-# rolling back
+        # rolling back
 
-# rolling back will emit a ROLLBACK on the SQL connection in progress, and will
-# expire all objects currently associated with this Session -- they will refresh
-# themselves when next accessed via lazy-loading
+        # rolling back will emit a ROLLBACK on the SQL connection in progress, and will
+        # expire all objects currently associated with this Session -- they will refresh
+        # themselves when next accessed via lazy-loading
 
-session.rollback()
+        session.rollback()
 
-# examining the sandy.__dict__ will show nearly no state compared to before
+        # examining the sandy.__dict__ will show nearly no state compared to before
 
-sandy.fullname
+        sandy.fullname
 
-# examining the sandy.__dict__ object shows the fields fresh from the DBMS
+        # examining the sandy.__dict__ object shows the fields fresh from the DBMS
 
-# patrick is back too
-patrick in session
-session.execute(select(User).where(User.name == "patrick")).scalar_one() is patrick
+        # patrick is back too
+        patrick in session
+        session.scalars(select(User).where(User.name == "patrick")).one() is patrick
 
-# closing a session
-session.close()
+        # closing a session
+        session.close()
 
-# the characters are now in a detatched state
-from sqlalchemy.orm.exc import DetachedInstanceError
-try:
-    squidward.name
-except DetachedInstanceError:
-    print("squidward is detatched from the session.")
+        # the characters are now in a detatched state
+        from sqlalchemy.orm.exc import DetachedInstanceError
+        try:
+            squidward.name
+        except DetachedInstanceError:
+            print("squidward is detatched from the session.")
 
-# detatched objects can be set with the same, or new Session using add()
-session.add(squidward)
-squidward.name
+        # detatched objects can be set with the same, or new Session using add()
+        session.add(squidward)
+        squidward.name
 
-# -----------------------------------------------------------------------------
-# Working with related objects
-# https://docs.sqlalchemy.org/en/14/tutorial/orm_related_objects.html#working-with-related-objects
+        # -------------------------------------------------------------------------
+        # Working with related objects
+        # https://docs.sqlalchemy.org/en/14/tutorial/orm_related_objects.html#working-with-related-objects
 
-u1 = User(name="pkrabs", fullname="Pearl Krabs")
-u1.addresses
+        u1 = User(name="pkrabs", fullname="Pearl Krabs")
+        u1.addresses
 
-a1 = Address(email_address="pearl.krabs@bikinibottom.net")
-u1.addresses.append(a1)
+        a1 = Address(email_address="pearl.krabs@bikinibottom.net")
+        u1.addresses.append(a1)
 
-u1.addresses
+        u1.addresses
 
-a1.user
-a2 = Address(email_address="pearl@bikinibottom.net", user=u1)
-u1.addresses
-a2.user = u1
+        a1.user
+        a2 = Address(email_address="pearl@bikinibottom.net", user=u1)
+        u1.addresses
+        a2.user = u1
 
-# cascading objects into the session
-session.add(u1)
-u1 in session
-a1 in session
-a2 in session
+        # cascading objects into the session
+        session.add(u1)
+        u1 in session
+        a1 in session
+        a2 in session
 
-print(u1.id)
-print(a1.user_id)
+        print(u1.id)
+        print(a1.user_id)
 
-session.commit()
+        session.commit()
 
-# loading relationships
-u1.id
+        # loading relationships
+        u1.id
 
-u1.addresses
-a1
-a2
+        u1.addresses
+        a1
+        a2
 
-# using relationships in queries
+        # using relationships in queries
 
-# using relationships to join
-print(select(Address.email_address).select_from(User).join(User.addresses))
+        # using relationships to join
+        show(select(Address.email_address).select_from(User).join(User.addresses))
 
-print(select(Address.email_address).join_from(User, Address))
+        show(select(Address.email_address).join_from(User, Address))
 
-# joining between Aliased targets
-print(
-    select(User)
-    .join(User.addresses.of_type(address_alias_1))
-    .where(address_alias_1.email_address == "patrick@bikinibottom.net")
-    .join(User.addresses.of_type(address_alias_2))
-    .where(address_alias_2.email_address == "patrick@aol.com")
-)
+        # joining between Aliased targets
+        show(
+            select(User)
+            .join(User.addresses.of_type(address_alias_1))
+            .where(address_alias_1.email_address == "patrick@bikinibottom.net")
+            .join(User.addresses.of_type(address_alias_2))
+            .where(address_alias_2.email_address == "patrick@aol.com")
+        )
 
-user_alias_1 = aliased(User)
-print(select(user_alias_1.name).join(user_alias_1.addresses))
+        user_alias_1 = aliased(User)
+        show(select(user_alias_1.name).join(user_alias_1.addresses))
 
-# augmenting the ON Criteria
-stmt = select(User.fullname).join(
-    User.addresses.and_(Address.email_address == "pearl.krabs@bikinibottom.net")
-)
-session.execute(stmt).all()
+        # augmenting the ON Criteria
+        stmt = select(User.fullname).join(
+            User.addresses.and_(Address.email_address == "pearl.krabs@bikinibottom.net")
+        )
+        session.scalars(stmt).all()
 
-# EXISTS forms: has() / any()
-stmt = select(User.fullname).where(
-    User.addresses.any(Address.email_address == "pearl.krabs@bikinibottom.net")
-)
-session.execute(stmt).all()
+        # EXISTS forms: has() / any()
+        stmt = select(User.fullname).where(
+            User.addresses.any(Address.email_address == "pearl.krabs@bikinibottom.net")
+        )
+        session.scalars(stmt).all()
 
-stmt = select(User.fullname).where(~User.addresses.any())
-session.execute(stmt).all()
+        stmt = select(User.fullname).where(~User.addresses.any())
+        session.scalars(stmt).all()
 
-stmt = select(Address.email_address).where(Address.user.has(User.name == "pkrabs"))
-session.execute(stmt).all()
+        stmt = select(Address.email_address).where(Address.user.has(User.name == "pkrabs"))
+        session.scalars(stmt).all()
+    finally:
+        session.close()